@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: offline end-to-end run of the search -> filter -> scrape -> summary pipeline.
+
+No Tor, no live engines and no LLM account are needed. A local HTTP server is set
+as TOR_PROXY_URL, so every .onion request the vendor code makes arrives there as
+a plain proxy request:
+  - hosts from SEARCH_ENGINE_ENDPOINTS get a results page of onion links
+  - any other .onion URL gets its own HTML page of --page-kb KiB (no two alike,
+    so near-duplicate folding does not shrink the scrape stage)
+Both have their own latency (with jitter) and --failure-rate (503s). A stub chat
+model stands in for the LLM with --llm-latency per call.
+
+Stages, each run --runs times on the shared pools:
+  search    get_search_results
+  filter    filter_results (stub LLM)
+  scrape    scrape_multiple on the filtered links
+  summary   generate_summary (stub LLM)
+  pipeline  run_pipeline (search, filter and scrape overlapped)
+  runner    runner.py with a batch of --runs requests in a subprocess (offline robin engine)
+
+Reports throughput, p50/p95 latency per stage and the peak Python heap of one
+extra traced pass. Add --json FILE to keep the numbers (and the vendor telemetry
+histograms) for comparison across commits; --telemetry prints the histograms.
+Page and LLM caches are off, and engine health starts from a temp file.
+
+    python benchmarks/bench_e2e.py [--runs 5] [--engine-latency 0.2] [--failure-rate 0.1] [--page-kb 64]
+"""
+
+import argparse
+import base64
+import hashlib
+import http.server
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+APP_BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))  # .../python
+VENDOR_DIR = os.path.join(APP_BASE, "vendor")
+
+WORDS = (
+    "market forum leak dump credentials ransomware bitcoin wallet escrow vendor "
+    "exploit access panel invite onion mirror database combo carding botnet"
+).split()
+
+
+def onion_host(label, i):
+    digest = hashlib.sha256(f"{label}{i}".encode()).digest()
+    return base64.b32encode(digest).decode().lower().rstrip("=")[:56] + ".onion"
+
+
+def results_page(rng, sites, count, query):
+    query_words = [w for w in query.replace("+", " ").split() if w]
+    links = []
+    for host in rng.sample(sites, min(count, len(sites))):
+        title = " ".join(rng.sample(WORDS, 3) + rng.sample(query_words, min(len(query_words), rng.randint(0, 2))))
+        links.append(f'<li><a href="http://{host}/{rng.randint(1, 999)}">{title}</a></li>')
+    return ("<html><body><h1>Results</h1><ul>" + "".join(links) + "</ul></body></html>").encode("utf-8")
+
+
+def content_page(rng, size_kb):
+    head = "<html><head><title>page</title><script>" + ("var a=1;" * 200) + "</script></head><body>"
+    paras = []
+    size = len(head)
+    while size < size_kb * 1024:
+        para = "<p>" + " ".join(rng.choice(WORDS) for _ in range(40)) + "</p>\n"
+        paras.append(para)
+        size += len(para)
+    return (head + "".join(paras) + "</body></html>").encode("utf-8")
+
+
+class StandIn:
+    """Settings and canned bodies shared by the proxy handler threads."""
+
+    def __init__(self, args, engine_hosts):
+        self.args = args
+        self.engine_hosts = engine_hosts
+        self.sites = [onion_host("site", i) for i in range(args.sites)]
+        self.pages = {}  # url -> body; generated on first request
+        self.lock = threading.Lock()
+        self.rng = random.Random(args.seed)
+        self.requests = 0
+
+    def delay(self, base):
+        with self.lock:
+            self.requests += 1
+            jitter = self.rng.uniform(-self.args.jitter, self.args.jitter)
+            failed = self.rng.random() < self.args.failure_rate
+        time.sleep(max(0.0, base * (1 + jitter)))
+        return failed
+
+    def page(self, url):
+        with self.lock:
+            body = self.pages.get(url)
+        if body is None:
+            body = content_page(random.Random(f"{self.args.seed}{url}"), self.args.page_kb)
+            with self.lock:
+                body = self.pages.setdefault(url, body)
+        return body
+
+
+class _ProxyHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    standin: StandIn = None  # set before the server starts
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        host = parts.hostname or self.headers.get("Host", "")
+        engine = host in self.standin.engine_hosts
+        failed = self.standin.delay(self.standin.args.engine_latency if engine else self.standin.args.page_latency)
+        if failed:
+            self._send(503, b"unavailable", "text/plain")
+            return
+        if engine:
+            query = parts.query.split("=", 1)[-1]
+            rng = random.Random(f"{host}{query}")  # same engine + query -> same page
+            self._send(200, results_page(rng, self.standin.sites, self.standin.args.results, query), "text/html")
+        else:
+            self._send(200, self.standin.page(f"{host}{parts.path}"), "text/html")
+
+    def _send(self, status, body, ctype):
+        self.send_response(status)
+        self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _QuietServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # early hang-ups from the streamed reader are expected
+
+
+def make_stub_llm(latency):
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class StubLLM(BaseChatModel):
+        """Answers filter prompts with indices 1-20 and everything else with a fixed report."""
+        latency: float = 0.0
+        model_name: str = "bench-stub"
+
+        @property
+        def _llm_type(self):
+            return "bench-stub"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(self.latency)
+            prompt = "\n".join(str(m.content) for m in messages)
+            if "indices" in prompt:
+                text = ", ".join(str(i) for i in range(1, 21))
+            else:
+                text = "1. Input Query\n2. Source Links\n3. Investigation Artifacts\n4. Key Insights\n5. Next Steps\n"
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    return StubLLM(latency=latency, callbacks=None)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_stage(fn, runs):
+    """Calls fn() runs times; returns (seconds per run, units per run)."""
+    seconds, units = [], []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        units.append(fn())
+        seconds.append(time.perf_counter() - t0)
+    return seconds, units
+
+
+def traced_peak(fn):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_runner_batch(runs, query, tmp):
+    """runner.py on a batch of runs requests; returns (wall seconds, per-request seconds)."""
+    in_path = os.path.join(tmp, "batch_in.json")
+    out_path = os.path.join(tmp, "batch_out.json")
+    with open(in_path, "w", encoding="utf-8") as f:
+        json.dump([{"query": f"{query} {i}", "text_report": False} for i in range(runs)], f)
+    # Own findings DB and logs dir: the real webhook spool must not be replayed, nor the live metrics overwritten
+    env = {**os.environ, "NCA_FINDINGS_DB": os.path.join(tmp, "findings.sqlite3"), "NCA_LOGS_DIR": os.path.join(tmp, "logs")}
+    env.pop("NCA_LIVE", None)
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join(APP_BASE, "runner.py"), "--input", in_path, "--output", out_path],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+    )
+    wall = time.perf_counter() - t0
+    with open(out_path, encoding="utf-8") as f:
+        result = json.load(f)
+    return wall, [r["seconds"] for r in result["results"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--query", default="ransomware leak")
+    parser.add_argument("--threads", type=int, default=5, help="max_workers passed to the vendor stages")
+    parser.add_argument("--engines", type=int, default=0, help="Stand-in engines used (0 = all SEARCH_ENGINE_ENDPOINTS)")
+    parser.add_argument("--results", type=int, default=40, help="Links per results page")
+    parser.add_argument("--sites", type=int, default=300, help="Distinct onion sites the engines link to")
+    parser.add_argument("--page-kb", type=int, default=64)
+    parser.add_argument("--engine-latency", type=float, default=0.2, help="Seconds per engine answer")
+    parser.add_argument("--page-latency", type=float, default=0.1, help="Seconds per scraped page")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency jitter as a fraction (+/-)")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Share of requests answered 503")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per stub LLM call")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the numbers to this file")
+    parser.add_argument("--telemetry", action="store_true", help="Also print the vendor span histograms")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_e2e_")
+    server = _QuietServer(("127.0.0.1", 0), _ProxyHandler)
+    # Must be set before the vendor modules read config
+    os.environ["TOR_PROXY_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["PAGE_CACHE_PATH"] = "off"
+    os.environ["LLM_CACHE_PATH"] = "off"
+    os.environ["ENDPOINT_HEALTH_PATH"] = os.path.join(tmp, "endpoint_health.json")
+    sys.path.insert(0, VENDOR_DIR)
+
+    import search  # noqa: E402
+    from scrape import scrape_multiple  # noqa: E402
+    from pipeline import run_pipeline  # noqa: E402
+    from llm import filter_results, generate_summary  # noqa: E402
+    import telemetry  # noqa: E402
+
+    if args.engines:
+        search.SEARCH_ENGINE_ENDPOINTS = search.SEARCH_ENGINE_ENDPOINTS[:args.engines]
+    engine_hosts = {urlsplit(e.format(query="q")).hostname for e in search.SEARCH_ENGINE_ENDPOINTS}
+    _ProxyHandler.standin = StandIn(args, engine_hosts)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    llm = make_stub_llm(args.llm_latency)
+    query = args.query.replace(" ", "+")
+    state = {}
+
+    def do_search():
+        state["results"] = search.get_search_results(query, max_workers=args.threads)
+        return len(state["results"])
+
+    def do_filter():
+        state["filtered"] = filter_results(llm, args.query, state["results"])
+        return len(state["filtered"])
+
+    def do_scrape():
+        state["scraped"] = scrape_multiple(state["filtered"], max_workers=args.threads)
+        return len(state["scraped"])
+
+    def do_summary():
+        generate_summary(llm, args.query, state["scraped"])
+        return 1
+
+    def do_pipeline():
+        results, filtered, scraped = run_pipeline(llm, args.query, max_workers=args.threads)
+        return len(scraped)
+
+    stages = [
+        ("search", do_search, "results"),
+        ("filter", do_filter, "picks"),
+        ("scrape", do_scrape, "pages"),
+        ("summary", do_summary, "calls"),
+        ("pipeline", do_pipeline, "pages"),
+    ]
+
+    report = {"args": vars(args), "stages": {}}
+    print(f"{'stage':<9} | {'p50 ms':>8} {'p95 ms':>8} | {'units/run':>9} {'throughput':>16} | {'peak heap':>10}")
+    try:
+        for name, fn, unit in stages:
+            seconds, units = run_stage(fn, args.runs)
+            peak = traced_peak(fn)
+            total = sum(seconds) or 1e-9
+            row = {
+                "p50_ms": statistics.median(seconds) * 1000,
+                "p95_ms": percentile(seconds, 95) * 1000,
+                "units_per_run": statistics.mean(units),
+                "throughput_per_s": sum(units) / total,
+                "unit": unit,
+                "peak_heap_kib": peak / 1024,
+            }
+            report["stages"][name] = row
+            print(
+                f"{name:<9} | {row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f} | {row['units_per_run']:>9.1f} "
+                f"{row['throughput_per_s']:>9.1f} {unit + '/s':<6} | {row['peak_heap_kib']:>6.0f} KiB"
+            )
+
+        wall, per_request = run_runner_batch(args.runs, args.query, tmp)
+        row = {
+            "p50_ms": statistics.median(per_request) * 1000,
+            "p95_ms": percentile(per_request, 95) * 1000,
+            "units_per_run": 1,
+            "throughput_per_s": len(per_request) / wall,
+            "unit": "requests",
+            "wall_s": wall,
+        }
+        report["stages"]["runner"] = row
+        print(
+            f"{'runner':<9} | {row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f} | {1:>9.1f} "
+            f"{row['throughput_per_s']:>9.1f} {'req/s':<6} | {'(subprocess)':>10}"
+        )
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"stand-in requests served: {_ProxyHandler.standin.requests}")
+    if args.telemetry:
+        for line in telemetry.summary_lines():
+            print(f"  {line}")
+    report["telemetry"] = telemetry.snapshot()["metrics"]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: full download + BeautifulSoup vs. streamed, bounded text extraction.
+
+Serves synthetic HTML pages of several sizes from a local HTTP server and, for
+each one, compares:
+  before: requests.get() -> BeautifulSoup(response.text, "html.parser").get_text()[:max_chars]
+  after:  streamed fetch -> scrape.extract_text_stream() (stops at max_chars / max_bytes)
+
+Reports bytes read and parse time per page size. No Tor or network access needed.
+
+    python benchmarks/bench_scrape_extract.py [--sizes 50,500,2000] [--repeat 5] [--max-chars 1200]
+"""
+
+import argparse
+import http.server
+import os
+import statistics
+import sys
+import threading
+import time
+
+APP_BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))  # .../python
+sys.path.insert(0, os.path.join(APP_BASE, "vendor"))
+
+import requests  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+from scrape import extract_text_stream, SCRAPE_MAX_BYTES, CHUNK_SIZE  # noqa: E402
+
+
+def make_page(size_kb: int) -> bytes:
+    """A page with a heavy <head>, then paragraphs until it reaches size_kb."""
+    head = "<html><head><title>bench</title><style>" + ("p{margin:0}" * 400) + "</style>"
+    head += "<script>" + ("var x=1;" * 800) + "</script></head><body>"
+    para = "<p>Lorem ipsum dolor sit amet &amp; consectetur <b>adipiscing</b> elit, sed do eiusmod.</p>\n"
+    body = []
+    size = len(head)
+    target = size_kb * 1024
+    while size < target:
+        body.append(para)
+        size += len(para)
+    return (head + "".join(body) + "</body></html>").encode("utf-8")
+
+
+class _PageHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages: dict[str, bytes] = {}
+
+    def do_GET(self):
+        body = self.pages[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _QuietServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # early hang-ups from the streamed reader are expected
+
+
+def run_before(session, url, max_chars):
+    response = session.get(url, timeout=30)
+    t0 = time.perf_counter()
+    text = BeautifulSoup(response.text, "html.parser").get_text().replace("\n", " ").replace("\r", "")
+    parse = time.perf_counter() - t0
+    return text[:max_chars], len(response.content), parse
+
+
+def run_after(session, url, max_chars):
+    with session.get(url, timeout=30, stream=True) as response:
+        t0 = time.perf_counter()
+        text, bytes_read, _ = extract_text_stream(
+            response.iter_content(CHUNK_SIZE), response.encoding, max_chars, SCRAPE_MAX_BYTES
+        )
+        parse = time.perf_counter() - t0
+    return text, bytes_read, parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="50,500,2000", help="Page sizes in KiB (comma-separated)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-chars", type=int, default=1200)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    _PageHandler.pages = {f"/{kb}": make_page(kb) for kb in sizes}
+    server = _QuietServer(("127.0.0.1", 0), _PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'page':>8} | {'before: bytes':>13} {'parse ms':>9} | {'after: bytes':>12} {'parse ms':>9} | same text")
+    session = requests.Session()
+    try:
+        for kb in sizes:
+            url = f"{base}/{kb}"
+            before = [run_before(session, url, args.max_chars) for _ in range(args.repeat)]
+            after = [run_after(session, url, args.max_chars) for _ in range(args.repeat)]
+            same = before[0][0] == after[0][0]
+            print(
+                f"{kb:>5} KiB | {before[0][1]:>13,} {statistics.median(b[2] for b in before) * 1000:>9.2f} | "
+                f"{after[0][1]:>12,} {statistics.median(a[2] for a in after) * 1000:>9.2f} | {same}"
+            )
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
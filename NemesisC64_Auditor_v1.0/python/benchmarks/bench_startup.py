@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: cold-start time and imported-module count of the Robin/LLM entry points.
+
+Each scenario runs in a fresh interpreter, so nothing is already imported. The
+vendor scenarios start in vendor/ like the robin CLI; the runner ones start with
+only python/ on sys.path, like `python runner.py`:
+  llm_utils       import llm_utils (model map + streaming handler)
+  llm             import llm
+  get_llm         import llm; get_llm(<model>) (loads exactly one provider SDK)
+  robin --help    the vendor CLI up to argument parsing
+  runner          import runner (the WPF bridge)
+  runner engine   import runner; RobinEngine().load() (what a cold one-shot run imports)
+
+Reports the median process wall time, the in-process import time, the number of
+modules in sys.modules and which provider SDKs got loaded. With --fail-over, exits 1
+when any scenario's median import time is above that many seconds (for CI).
+
+    python benchmarks/bench_startup.py [--repeat 5] [--model llama3.1] [--fail-over 2.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))  # .../python
+VENDOR_DIR = os.path.join(APP_BASE, "vendor")
+
+PROVIDERS = ("langchain_openai", "langchain_anthropic", "langchain_ollama", "langchain_google_genai")
+
+_CHILD = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+t0 = time.perf_counter()
+{body}
+print(json.dumps({{
+    "seconds": time.perf_counter() - t0,
+    "modules": len(sys.modules),
+    "providers": [p for p in {providers!r} if p in sys.modules],
+}}))
+"""
+
+
+def scenarios(model):
+    """(name, body, runs from vendor/)"""
+    return [
+        ("llm_utils", "import llm_utils", True),
+        ("llm", "import llm", True),
+        (f"get_llm({model})", f"import llm\nllm.get_llm({model!r})", True),
+        ("robin --help", "import main\ntry:\n    main.robin(['--help'], standalone_mode=False)\nexcept SystemExit:\n    pass", True),
+        ("runner", "import runner", False),
+        ("runner engine", "import runner\nrunner.RobinEngine().load([])", False),
+    ]
+
+
+def run_child(body, vendor=True):
+    paths = [APP_BASE, VENDOR_DIR] if vendor else [APP_BASE]
+    code = _CHILD.format(paths=paths, body=body, providers=PROVIDERS)
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=VENDOR_DIR if vendor else APP_BASE, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "child failed")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall"] = wall
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--model", default="llama3.1", help="Model for the get_llm scenario")
+    parser.add_argument("--fail-over", type=float, default=None, help="Import-time budget in seconds")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<22} | {'wall ms':>8} {'import ms':>9} {'modules':>8} | providers loaded")
+    over = []
+    for name, body, vendor in scenarios(args.model):
+        try:
+            runs = [run_child(body, vendor) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{name:<22} | failed: {e}")
+            continue
+        wall = statistics.median(r["wall"] for r in runs)
+        seconds = statistics.median(r["seconds"] for r in runs)
+        print(
+            f"{name:<22} | {wall * 1000:>8.0f} {seconds * 1000:>9.0f} {runs[0]['modules']:>8} | "
+            f"{', '.join(runs[0]['providers']) or '-'}"
+        )
+        if args.fail_over is not None and seconds > args.fail_over:
+            over.append(name)
+
+    if over:
+        print(f"over the {args.fail_over:.2f}s import budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
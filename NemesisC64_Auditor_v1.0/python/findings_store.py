@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+NemesisC64 Auditor - findings store (findings_store.py)
+
+SQLite database of every finding runner.py has reported, so a run can tell which
+findings are new for its query and history can be searched without grepping
+/reports. Findings are deduplicated per query on a fingerprint of
+(type, detail, location); a full-text index (FTS5 when the SQLite build has it)
+covers type, detail, location and query.
+
+Path: NCA_FINDINGS_DB (default /reports/findings.sqlite3); set it to "off" to disable.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+PROJECT_BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+DEFAULT_DB_PATH = os.path.join(PROJECT_BASE, "reports", "findings.sqlite3")
+FINDINGS_DB = os.getenv("NCA_FINDINGS_DB", DEFAULT_DB_PATH)
+
+SCHEMA_VERSION = 1
+
+
+def query_key(query: str | None) -> str:
+    """Queries that differ only in case or spacing share history."""
+    return " ".join((query or "").split()).lower()
+
+
+def fingerprint(finding: dict) -> str:
+    parts = [" ".join(str(finding.get(k) or "").split()).lower() for k in ("type", "detail", "location")]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class FindingsStore:
+    def __init__(self, path: str = FINDINGS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock:
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS runs (
+                       id INTEGER PRIMARY KEY,
+                       query TEXT NOT NULL,
+                       query_key TEXT NOT NULL,
+                       started_at REAL NOT NULL,
+                       finished_at REAL,
+                       findings INTEGER NOT NULL DEFAULT 0,
+                       new_findings INTEGER NOT NULL DEFAULT 0
+                   )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS runs_query ON runs (query_key, id)")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS findings (
+                       id INTEGER PRIMARY KEY,
+                       query_key TEXT NOT NULL,
+                       fingerprint TEXT NOT NULL,
+                       type TEXT NOT NULL,
+                       detail TEXT NOT NULL,
+                       location TEXT NOT NULL,
+                       first_run INTEGER NOT NULL,
+                       last_run INTEGER NOT NULL,
+                       first_seen REAL NOT NULL,
+                       last_seen REAL NOT NULL,
+                       seen_count INTEGER NOT NULL DEFAULT 1,
+                       UNIQUE (query_key, fingerprint)
+                   )"""
+            )
+            try:
+                self._db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts "
+                    "USING fts5(type, detail, location, query, content='')"
+                )
+                self.fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: search falls back to LIKE scans
+                self.fts = False
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def begin_run(self, query: str | None) -> int:
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO runs (query, query_key, started_at) VALUES (?, ?, ?)",
+                (query or "", query_key(query), time.time()),
+            )
+            return cur.lastrowid
+
+    def add(self, run_id: int, query: str | None, finding: dict) -> bool:
+        """Records finding for run_id; True when its query never reported it before."""
+        key = query_key(query)
+        fp = fingerprint(finding)
+        now = time.time()
+        row = (str(finding.get("type") or ""), str(finding.get("detail") or ""), str(finding.get("location") or ""))
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE findings SET last_run = ?, last_seen = ?, seen_count = seen_count + 1 "
+                "WHERE query_key = ? AND fingerprint = ? AND last_run != ?",
+                (run_id, now, key, fp, run_id),
+            )
+            if cur.rowcount:
+                return False
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO findings (query_key, fingerprint, type, detail, location, "
+                "first_run, last_run, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, fp, *row, run_id, run_id, now, now),
+            )
+            if not cur.rowcount:
+                return False  # repeated within this run
+            if self.fts:
+                self._db.execute(
+                    "INSERT INTO findings_fts (rowid, type, detail, location, query) VALUES (?, ?, ?, ?, ?)",
+                    (cur.lastrowid, *row, key),
+                )
+            return True
+
+    def finish_run(self, run_id: int, findings: int, new_findings: int) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE runs SET finished_at = ?, findings = ?, new_findings = ? WHERE id = ?",
+                (time.time(), findings, new_findings, run_id),
+            )
+
+    def search(self, text: str, query: str | None = None, limit: int = 50) -> list[dict]:
+        """
+        Findings across all runs matching text, best matches first. FTS5 query syntax
+        works where SQLite has it; text that isn't valid syntax (example.com,
+        user@mail.com, http://...) is searched as a phrase instead.
+        """
+        if not self.fts:
+            return self._search(text, query, limit, fts=False)
+        try:
+            return self._search(text, query, limit, fts=True)
+        except sqlite3.OperationalError:
+            pass
+        try:
+            return self._search('"' + text.replace('"', '""') + '"', query, limit, fts=True)
+        except sqlite3.OperationalError:
+            return self._search(text, query, limit, fts=False)
+
+    def _search(self, text: str, query: str | None, limit: int, fts: bool) -> list[dict]:
+        select = (
+            "SELECT f.type, f.detail, f.location, r.query, f.first_seen, f.last_seen, f.seen_count "
+            "FROM findings f JOIN runs r ON r.id = f.first_run "
+        )
+        if fts:
+            sql = select + "JOIN findings_fts ON findings_fts.rowid = f.id WHERE findings_fts MATCH ?"
+            args: list = [text]
+        else:
+            sql = select + "WHERE (f.type || ' ' || f.detail || ' ' || f.location) LIKE ?"
+            args = [f"%{text}%"]
+        if query is not None:
+            sql += " AND f.query_key = ?"
+            args.append(query_key(query))
+        sql += " ORDER BY " + ("findings_fts.rank" if fts else "f.last_seen DESC") + " LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [_finding_row(row) for row in rows]
+
+
+def _finding_row(row) -> dict:
+    keys = ("type", "detail", "location", "query", "first_seen", "last_seen", "seen_count")
+    return dict(zip(keys, row))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_findings_store():
+    """Returns the shared FindingsStore, or None when NCA_FINDINGS_DB is 'off'."""
+    global _store
+    if FINDINGS_DB.strip().lower() in ("", "off", "0", "false", "no"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = FindingsStore()
+    return _store
@@ -10,36 +10,44 @@ This script is invoked by the WPF app. It:
   3) Writes a result JSON (path via --output) with:
         { "summary": str, "findings": [{type, detail, location}, ...], "log_lines": [ ... ] }
   4) Emits a human-readable report into /reports/
-  5) If a webhook is provided, POSTs the JSON result there (best-effort)
+  5) If a webhook is provided, queues the JSON result for background delivery
+     (retried with backoff and spooled under /logs until it is accepted)
+
+With --serve it instead stays resident and answers AuditorRequest payloads
+sent as JSON lines over stdin (default) or a local TCP port (--port), so the
+Robin modules are imported once and network pools stay warm between audits.
 """
 
 import argparse
+import contextlib
 import json
 import sys
 import os
 import datetime
+import signal
+import socketserver
+import tempfile
+import threading
+import time
 import traceback
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from findings_store import get_findings_store
+from webhook_queue import get_webhook_queue
 
 # --- Resolve app base (bin folder) and project-relative folders ---
 APP_BASE = os.path.abspath(os.path.dirname(__file__))             # .../python
 PROJECT_BASE = os.path.abspath(os.path.join(APP_BASE, os.pardir)) # .../
 REPORTS_DIR = os.path.join(PROJECT_BASE, "reports")
-LOGS_DIR = os.path.join(PROJECT_BASE, "logs")
+LOGS_DIR = os.getenv("NCA_LOGS_DIR") or os.path.join(PROJECT_BASE, "logs")  # metrics, webhook spool, dumps
+METRICS_PATH = os.path.join(LOGS_DIR, "auditor_metrics.prom")  # Prometheus textfile, rewritten per request
 ASSETS_DIR = os.path.join(PROJECT_BASE, "assets")
 VENDOR_ROBIN_DIR = os.path.join(APP_BASE, "vendor", "robin")
 
 os.makedirs(REPORTS_DIR, exist_ok=True)
 os.makedirs(LOGS_DIR, exist_ok=True)
 
-# --- Optional requests import (for webhook) ---
-try:
-    import requests  # type: ignore
-    _HAS_REQUESTS = True
-except Exception:
-    _HAS_REQUESTS = False
-
-
 def _now_utc_iso():
     return datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
@@ -59,103 +67,142 @@ def load_input_json(path: str) -> dict:
 
 def write_output_json(path: str, payload: dict) -> None:
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+        if isinstance(payload.get("findings"), list):
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        else:
+            # Spooled findings (--stream): written one at a time, never held as a list
+            for chunk in iter_result_json(payload):
+                f.write(chunk)
+
+
+def iter_result_json(payload: dict):
+    """Yield the payload as JSON text in pieces, reading "findings" lazily from any iterable."""
+    yield "{"
+    for n, (key, value) in enumerate(payload.items()):
+        yield ("," if n else "") + "\n  " + json.dumps(key) + ": "
+        if key == "findings":
+            yield "["
+            for i, finding in enumerate(value):
+                yield ("," if i else "") + "\n    " + json.dumps(finding, ensure_ascii=False)
+            yield "\n  ]"
+        else:
+            yield json.dumps(value, ensure_ascii=False)
+    yield "\n}\n"
 
 
 def write_text_report(findings, summary_text, log_lines) -> str:
+    """Write the plain-text report; findings may be any iterable and are written as they are read."""
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    fn = f"auditor_report_{ts}.txt"
-    report_path = os.path.join(REPORTS_DIR, fn)
-
-    lines = []
-    lines.append("NemesisC64 Auditor — Report")
-    lines.append(f"Generated at: {datetime.datetime.now().isoformat(sep=' ', timespec='seconds')}")
-    lines.append("")
-    if summary_text:
-        lines.append("=== SUMMARY ===")
-        lines.append(summary_text)
-        lines.append("")
-    lines.append("=== FINDINGS ===")
-    if not findings:
-        lines.append("(no findings)")
-    else:
-        for i, f in enumerate(findings, 1):
-            f_type = f.get("type") or "unknown"
-            f_det = f.get("detail") or ""
-            f_loc = f.get("location") or ""
-            lines.append(f"{i:03d}. [{f_type}] {f_det}   @ {f_loc}")
-    lines.append("")
-    if log_lines:
-        lines.append("=== LOG ===")
-        lines.extend(log_lines)
-
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
 
+    # Concurrent runs (--serve) can land in the same second; never overwrite.
+    suffix = 0
+    while True:
+        fn = f"auditor_report_{ts}.txt" if not suffix else f"auditor_report_{ts}_{suffix}.txt"
+        report_path = os.path.join(REPORTS_DIR, fn)
+        try:
+            f = open(report_path, "x", encoding="utf-8")
+            break
+        except FileExistsError:
+            suffix += 1
+
+    with f:
+        f.write("NemesisC64 Auditor — Report\n")
+        f.write(f"Generated at: {datetime.datetime.now().isoformat(sep=' ', timespec='seconds')}\n")
+        f.write("\n")
+        if summary_text:
+            f.write("=== SUMMARY ===\n")
+            f.write(f"{summary_text}\n")
+            f.write("\n")
+        f.write("=== FINDINGS ===\n")
+        count = 0
+        for count, fd in enumerate(findings, 1):
+            f_type = fd.get("type") or "unknown"
+            f_det = fd.get("detail") or ""
+            f_loc = fd.get("location") or ""
+            f.write(f"{count:03d}. [{f_type}] {f_det}   @ {f_loc}\n")
+        if not count:
+            f.write("(no findings)\n")
+        if log_lines:
+            f.write("\n=== LOG ===\n")
+            f.write("\n".join(log_lines))
     return report_path
 
 
-def try_post_webhook(url: str, secret: str | None, payload: dict, log_lines: list[str]):
+def queue_webhook(url: str, secret: str | None, payload: dict, log_lines: list[str]) -> str | None:
+    """Spool the result for background delivery; returns the job id (see webhook_queue.py)."""
     if not url:
-        return
-    if not _HAS_REQUESTS:
-        log_lines.append("requests not installed; skipping webhook POST.")
-        return
+        return None
     try:
-        headers = {"Content-Type": "application/json"}
-        if secret:
-            headers["X-Auditor-Secret"] = secret
-        r = requests.post(url, headers=headers, json=payload, timeout=15)
-        log_lines.append(f"Webhook POST -> {url} [status={r.status_code}]")
+        job_id = get_webhook_queue().submit(url, secret, iter_result_json(payload))
     except Exception as ex:
-        log_lines.append(f"Webhook POST failed: {ex!r}")
+        log_lines.append(f"Webhook queueing failed: {ex!r}")
+        return None
+    log_lines.append(f"Webhook queued -> {url} [job={job_id}]")
+    return job_id
 
 
-def run_vendor_robin(query: str | None, use_tor: bool, log_lines: list[str]):
+class RobinEngine:
     """
-    Attempt to use the embedded vendor/robin engine.
-    We prefer robin/search.py (and/or scrape.py) if available.
-    Returns a tuple: (summary:str, findings:list[dict], extra_logs:list[str])
+    Resolves the embedded vendor/robin modules once and keeps them for reuse.
+    A one-shot run builds a fresh engine; --serve keeps a single engine alive so
+    later requests skip the sys.path setup and the import probing.
     """
-    # Make both the robin dir and its parent importable
-    sys.path.insert(0, VENDOR_ROBIN_DIR)                    # .../python/vendor/robin
-    sys.path.insert(0, os.path.join(APP_BASE, "vendor"))    # .../python/vendor
-
-    findings: list[dict] = []
-    summary = ""
-    extra = []
 
-    try:
-        # Try flat-module imports first (robin/search.py directly)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.search = None
+        self.scrape = None
+        self.entry = None
+        self.import_log: list[str] = []
+
+    def load(self, log_lines: list[str]):
+        """Import on first use, then replay the import diagnostics into log_lines."""
+        with self._lock:
+            if not self._loaded:
+                self._import(self.import_log)
+                self._loaded = True
+        log_lines.extend(self.import_log)
+        return self.entry
+
+    def _import(self, log_lines: list[str]) -> None:
+        # Make both the robin dir and its parent importable
+        for path in (VENDOR_ROBIN_DIR, os.path.join(APP_BASE, "vendor")):
+            if path not in sys.path:
+                sys.path.insert(0, path)                    # .../python/vendor/robin, .../python/vendor
+
+        # Package-style imports first (robin/search.py with __init__.py). A flat `import search`
+        # resolves to vendor/search.py, which has no entry point and would pull in bs4, fetch,
+        # the page cache and the rest of the vendor pipeline before we could tell.
         search = None
         scrape = None
 
         try:
-            import search as _search  # type: ignore
+            import robin.search as _search  # type: ignore
             search = _search
         except Exception as e:
-            log_lines.append(f"flat import 'search' failed: {e!r}")
+            log_lines.append(f"package import 'robin.search' failed: {e!r}")
 
         try:
-            import scrape as _scrape  # type: ignore
+            import robin.scrape as _scrape  # type: ignore
             scrape = _scrape
         except Exception as e:
-            log_lines.append(f"flat import 'scrape' failed: {e!r}")
+            log_lines.append(f"package import 'robin.scrape' failed: {e!r}")
 
-        # If flat import failed, try package-style imports (robin/search.py with __init__.py)
-        if search is None:
+        # Flat-module imports (robin/search.py directly) only if the package has no entry point
+        if search is None or not callable(getattr(search, "search", None)):
             try:
-                import robin.search as _search  # type: ignore
+                import search as _search  # type: ignore
                 search = _search
             except Exception as e:
-                log_lines.append(f"package import 'robin.search' failed: {e!r}")
+                log_lines.append(f"flat import 'search' failed: {e!r}")
 
         if scrape is None:
             try:
-                import robin.scrape as _scrape  # type: ignore
+                import scrape as _scrape  # type: ignore
                 scrape = _scrape
             except Exception as e:
-                log_lines.append(f"package import 'robin.scrape' failed: {e!r}")
+                log_lines.append(f"flat import 'scrape' failed: {e!r}")
 
         # === Diagnostics: which module was imported ===
         if search is not None:
@@ -172,9 +219,36 @@ def run_vendor_robin(query: str | None, use_tor: bool, log_lines: list[str]):
         entry = getattr(search, "search", None) if search else None
         if entry is None or not callable(entry):
             log_lines.append("Robin entry point missing: expected callable 'search.search(query, use_tor)'.")
+            entry = None
         else:
             log_lines.append("Robin entry point OK: search.search(query, use_tor) found.")
 
+        self.search = search
+        self.scrape = scrape
+        self.entry = entry
+
+
+def run_vendor_robin(query: str | None, use_tor: bool, log_lines: list[str], engine: RobinEngine | None = None,
+                     on_finding=None, telemetry_tag: str | None = None):
+    """
+    Attempt to use the embedded vendor/robin engine.
+    We prefer robin/search.py (and/or scrape.py) if available.
+    Pass a long-lived engine to reuse already-imported modules.
+    With on_finding, every finding is handed to it as soon as it is normalized
+    (no 50-item cap) and the returned findings list stays empty.
+    Vendor spans are tagged with telemetry_tag so the request's metrics only list its own.
+    Returns a tuple: (summary:str, findings:list[dict], extra_logs:list[str])
+    """
+    if engine is None:
+        engine = RobinEngine()
+
+    findings: list[dict] = []
+    summary = ""
+    extra = []
+
+    try:
+        entry = engine.load(log_lines)
+
         if not query:
             query = "suspicious credentials OR tokens OR invoices OR passwords"
 
@@ -183,9 +257,15 @@ def run_vendor_robin(query: str | None, use_tor: bool, log_lines: list[str]):
             log_lines.append("Calling vendor.robin.search.search() …")
             try:
                 t0 = datetime.datetime.now()
-                results = entry(query=query, use_tor=use_tor)  # type: ignore
+                telemetry = _vendor_telemetry()
+                with telemetry.request_scope(telemetry_tag) if telemetry else contextlib.nullcontext(), \
+                        telemetry.span("robin_search") if telemetry else contextlib.nullcontext():
+                    results = entry(query=query, use_tor=use_tor)  # type: ignore
                 dt = (datetime.datetime.now() - t0).total_seconds()
-                log_lines.append(f"Robin search() returned {len(results or [])} item(s) in {dt:.2f}s")
+                if isinstance(results, list) or results is None:
+                    log_lines.append(f"Robin search() returned {len(results or [])} item(s) in {dt:.2f}s")
+                else:
+                    log_lines.append(f"Robin search() returned an iterator in {dt:.2f}s")
             except Exception as ex:
                 log_lines.append(f"Robin search() raised: {ex!r}")
                 raise
@@ -196,12 +276,16 @@ def run_vendor_robin(query: str | None, use_tor: bool, log_lines: list[str]):
                 ftype = str(item.get("type", "result"))
                 detail = str(item.get("title", item.get("detail", "")))
                 loc = str(item.get("url", item.get("location", "")))
-                findings.append({"type": ftype, "detail": detail, "location": loc})
+                finding = {"type": ftype, "detail": detail, "location": loc}
                 count += 1
+                if on_finding is not None:
+                    on_finding(finding)
+                    continue
+                findings.append(finding)
                 if count >= 50:  # keep it tidy
                     break
 
-            summary = f"Robin search completed. Collected {len(findings)} result(s)."
+            summary = f"Robin search completed. Collected {count} result(s)."
         else:
             summary = "vendor/robin/search.py not available; skipping Robin search."
 
@@ -213,30 +297,15 @@ def run_vendor_robin(query: str | None, use_tor: bool, log_lines: list[str]):
     return summary, findings, extra
 
 
-def main():
-    parser = argparse.ArgumentParser(description="NemesisC64 Auditor runner")
-    parser.add_argument("--input", required=True, help="Path to input JSON")
-    parser.add_argument("--output", required=True, help="Path to output JSON")
-    args = parser.parse_args()
-
-    log_lines: list[str] = []
-    log_lines.append(f"runner.py start: { _now_utc_iso() }")
-    log_lines.append(f"APP_BASE={APP_BASE}")
-    log_lines.append(f"PROJECT_BASE={PROJECT_BASE}")
-
-    try:
-        req = load_input_json(args.input)
-    except Exception as ex:
-        err = f"Failed to read input JSON: {ex!r}"
-        log_lines.append(err)
-        out = {
-            "summary": "Input error.",
-            "findings": [],
-            "log_lines": log_lines,
-        }
-        write_output_json(args.output, out)
-        return 1
-
+def run_request(req: dict, log_lines: list[str], engine: RobinEngine | None = None,
+                stream: "ResultStream | None" = None) -> dict:
+    """
+    Run one AuditorRequest and return the AuditorResult payload.
+    With a stream (--stream), findings and stage progress are emitted as they happen
+    and the payload's "findings" is the stream's on-disk spool instead of a list.
+    """
+    started = time.time()
+    telemetry_tag = uuid.uuid4().hex
     # Extract request fields (keep keys aligned with the WPF contracts)
     query = (req.get("query") or "").strip() or None
     use_tor = bool(req.get("use_tor", False))
@@ -245,6 +314,8 @@ def main():
     email_to = (req.get("email_to") or "").strip()
     email_subject = (req.get("email_subject") or "").strip() or "NemesisC64 Auditor Report"
     attach_report = bool(req.get("attach_report", False))
+    new_only = bool(req.get("new_only", False))
+    text_report = bool(req.get("text_report", True))
 
     log_lines.append(f"Request: query={'<empty>' if not query else query!r}, use_tor={use_tor}, webhook={'yes' if webhook_url else 'no'}, email={'yes' if email_to else 'no'}, attach={attach_report}")
 
@@ -252,14 +323,44 @@ def main():
     log_lines.append(f"vendor/robin present: {vendor_present}")
 
     summary = ""
-    findings: list[dict] = []
+    findings = stream.spool if stream else []
 
     if vendor_present:
-        s, f, extra = run_vendor_robin(query, use_tor, log_lines)
+        store, run_id = _open_findings_run(query, log_lines)
+        tally = {"seen": 0, "new": 0}
+
+        def admit(finding: dict) -> bool:
+            """Record finding in the store; False when new_only drops it from the output."""
+            if store is None:
+                return True
+            is_new = store.add(run_id, query, finding)
+            tally["seen"] += 1
+            tally["new"] += is_new
+            return is_new or not new_only
+
+        def on_finding(finding: dict) -> None:
+            # Every finding reaches the store; only the returned list is capped
+            if not admit(finding):
+                return
+            if stream:
+                stream.finding(finding)
+            elif len(findings) < 50:  # keep it tidy
+                findings.append(finding)
+
+        if stream:
+            stream.stage("search", "start")
+        s, _, extra = run_vendor_robin(query, use_tor, log_lines, engine, on_finding=on_finding,
+                                       telemetry_tag=telemetry_tag)
         if s:
             summary = s
-        findings.extend(f)
         log_lines.extend(extra)
+        if store is not None:
+            store.finish_run(run_id, tally["seen"], tally["new"])
+            log_lines.append(f"Findings store: {tally['new']} new of {tally['seen']} (run #{run_id}, new_only={new_only})")
+            if summary:
+                summary += f" {tally['new']} new since previous runs."
+        if stream:
+            stream.stage("search", "done", findings=len(findings))
     else:
         # No vendor found; produce a harmless placeholder so UI flow can be tested
         summary = "Robin vendor engine not found. Performed a local stub scan."
@@ -269,9 +370,14 @@ def main():
     if not summary:
         summary = f"Scan complete at {datetime.datetime.now().isoformat(sep=' ', timespec='seconds')} with {len(findings)} finding(s)."
 
-    # Create/save a plain-text report
-    report_path = write_text_report(findings, summary, log_lines)
-    log_lines.append(f"Report saved: {report_path}")
+    # Create/save a plain-text report (optional export; history lives in the findings store)
+    if text_report:
+        report_path = write_text_report(findings, summary, log_lines)
+        log_lines.append(f"Report saved: {report_path}")
+        if stream:
+            stream.stage("report", "done", path=report_path)
+    else:
+        log_lines.append("Text report skipped (text_report=false).")
 
     # Build final payload
     result_payload = {
@@ -280,25 +386,522 @@ def main():
         "log_lines": log_lines,
     }
 
-    # Best-effort webhook
+    # Stage timings from the vendor modules: this request's spans plus the process-wide histograms
+    telemetry = _vendor_telemetry()
+    if telemetry:
+        result_payload["metrics"] = telemetry.snapshot(since=started, request=telemetry_tag)
+        try:
+            telemetry.write_prometheus(METRICS_PATH)
+        except Exception as ex:
+            log_lines.append(f"Metrics export failed: {ex!r}")
+
+    # Webhook: spooled now, delivered in the background so the result isn't held up
     if webhook_url:
-        try_post_webhook(webhook_url, webhook_secret, result_payload, log_lines)
+        job_id = queue_webhook(webhook_url, webhook_secret, result_payload, log_lines)
+        if stream:
+            stream.stage("webhook", "done", job=job_id)
 
     # NOTE: Email delivery is intentionally not implemented here.
     # Rationale: requires SMTP creds or OS-specific mail APIs.
     # The WPF app already allows saving/exporting reports; hooking SMTP can be added later.
 
+    return result_payload
+
+
+def _vendor_telemetry():
+    """vendor/telemetry.py once the Robin engine has put vendor/ on sys.path, else None."""
+    if os.path.join(APP_BASE, "vendor") not in sys.path:
+        return None
+    try:
+        import telemetry  # type: ignore
+        return telemetry
+    except Exception:
+        return None
+
+
+def _open_findings_run(query: str | None, log_lines: list[str]):
+    """(store, run_id) for recording this run's findings, or (None, None) when the store is off or unusable."""
+    try:
+        store = get_findings_store()
+        if store is None:
+            return None, None
+        return store, store.begin_run(query)
+    except Exception as ex:
+        log_lines.append(f"Findings store unavailable: {ex!r}")
+        return None, None
+
+
+def split_envelope(msg: dict):
+    """Return (id, request) for a bare AuditorRequest or an {"id": ..., "request": {...}} envelope."""
+    if isinstance(msg.get("request"), dict):
+        return msg.get("id"), msg["request"]
+    return None, msg
+
+
+# --- Batch mode --------------------------------------------------------------
+#
+# An --input file holding a list of AuditorRequests (or {"requests": [...]}) runs
+# them all in this process, --workers at a time, sharing imports, fetch pools
+# and caches. Identical searches are run once. See docs/PAYLOAD_SCHEMA.md.
+
+class CoalescingEngine(RobinEngine):
+    """RobinEngine whose search entry runs each distinct (query, use_tor) only once."""
+
+    def __init__(self):
+        super().__init__()
+        self._calls: dict[tuple, Future] = {}
+        self._calls_lock = threading.Lock()
+
+    @property
+    def unique_searches(self) -> int:
+        return len(self._calls)
+
+    def load(self, log_lines: list[str]):
+        entry = super().load(log_lines)
+        if entry is None:
+            return None
+        return lambda query, use_tor: self._search(entry, query, use_tor)
+
+    def _search(self, entry, query, use_tor):
+        key = (" ".join(str(query).split()), bool(use_tor))
+        with self._calls_lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+        if owner:
+            try:
+                # Materialized so every request with this query can iterate it
+                future.set_result(list(entry(query=query, use_tor=use_tor) or []))
+            except BaseException as ex:
+                future.set_exception(ex)
+        return future.result()
+
+
+def run_batch(requests: list, workers: int, log_lines: list[str], stream: "ResultStream | None" = None) -> dict:
+    """
+    Run a list of AuditorRequests concurrently; returns one AuditorResult per request plus timing.
+    With a stream, every request streams its own records, tagged with its index and id.
+    """
+    engine = CoalescingEngine()
+    total = len(requests)
+    log_lines.append(f"Batch: {total} request(s), workers={workers}")
+
+    def run_one(index: int, msg):
+        req_id, req = split_envelope(msg) if isinstance(msg, dict) else (None, msg)
+        job_stream = stream.for_request(index, req_id) if stream else None
+        job_log: list[str] = StreamedLog(job_stream) if job_stream else []
+        job_log.append(f"runner.py batch request {index + 1}/{total}: { _now_utc_iso() }")
+        t0 = time.perf_counter()
+        try:
+            if not isinstance(req, dict):
+                raise ValueError("expected a JSON object")
+            result = run_request(req, job_log, engine, stream=job_stream)
+            if job_stream:
+                # Per-request findings sit in the spool; the batch output lists them
+                result["findings"] = list(result["findings"])
+        except Exception as ex:
+            job_log.append(traceback.format_exc(limit=2))
+            result = {
+                "summary": f"runner.py request failed: {ex!r}",
+                "findings": [],
+                "log_lines": job_log,
+            }
+        finally:
+            if job_stream:
+                job_stream.close()
+        seconds = time.perf_counter() - t0
+        return {"id": req_id, "seconds": round(seconds, 3), "result": result}
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="auditor") as pool:
+        results = list(pool.map(run_one, range(total), requests))
+    wall = time.perf_counter() - t0
+
+    seconds = sorted(r["seconds"] for r in results)
+    timing = {
+        "requests": total,
+        "unique_searches": engine.unique_searches,
+        "workers": workers,
+        "wall_seconds": round(wall, 3),
+        "request_seconds_total": round(sum(seconds), 3),
+        "request_seconds_p50": seconds[len(seconds) // 2] if seconds else 0.0,
+        "request_seconds_max": seconds[-1] if seconds else 0.0,
+    }
+    findings = sum(len(r["result"]["findings"]) for r in results)
+    log_lines.append(
+        f"Batch done: {total} request(s), {engine.unique_searches} unique search(es), "
+        f"{findings} finding(s) in {wall:.2f}s"
+    )
+    return {
+        "summary": f"Batch completed: {total} request(s), {findings} finding(s) in {wall:.2f}s.",
+        "findings": [],
+        "log_lines": log_lines,
+        "results": results,
+        "timing": timing,
+    }
+
+
+# --- Streaming output (--stream) --------------------------------------------
+#
+# One JSON record per line on stdout while the run is in progress:
+#   {"type": "log", "line": ...}
+#   {"type": "stage", "stage": "search"|"report"|"webhook", "status": "start"|"done", ...}
+#   {"type": "finding", "index": n, "finding": {type, detail, location}}
+#   {"type": "final", "summary": ..., "findings": n, "output": ..., "exit_code": n}
+# The report path is on the "report" stage record. Findings are spooled to a temp
+# file rather than kept in memory; the output JSON and the report are written from
+# the spool. For batch input, each request's records also carry "request" (its
+# index) and "id"; "final" closes the whole batch. See docs/PAYLOAD_SCHEMA.md.
+
+class FindingSpool:
+    """Append-only findings store backed by a temp file; iterating re-reads it from disk."""
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=LOGS_DIR)
+        self._count = 0
+
+    def append(self, finding: dict) -> None:
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(json.dumps(finding, ensure_ascii=False) + "\n")
+        self._count += 1
+
+    def extend(self, findings) -> None:
+        for finding in findings:
+            self.append(finding)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ResultStream:
+    """Emits NDJSON records for one run and owns its finding spool."""
+
+    def __init__(self, out, lock=None, tags: dict | None = None):
+        self.out = out
+        self.lock = lock or threading.Lock()
+        self.tags = tags or {}
+        self.spool = FindingSpool()
+
+    def for_request(self, index: int, req_id) -> "ResultStream":
+        """Stream for one request of a batch: same output, own spool, records tagged with index and id."""
+        return ResultStream(self.out, self.lock, {"request": index, "id": req_id})
+
+    def emit(self, record_type: str, **fields) -> None:
+        with self.lock:
+            self.out.write(_json_line({"type": record_type, **self.tags, **fields}))
+            self.out.flush()
+
+    def log(self, line: str) -> None:
+        self.emit("log", line=line)
+
+    def stage(self, stage: str, status: str, **info) -> None:
+        self.emit("stage", stage=stage, status=status, **info)
+
+    def finding(self, finding: dict) -> None:
+        self.spool.append(finding)
+        self.emit("finding", index=len(self.spool), finding=finding)
+
+    def close(self) -> None:
+        self.spool.close()
+
+
+class StreamedLog(list):
+    """log_lines list that also emits every appended line as a "log" record."""
+
+    def __init__(self, stream: ResultStream, lines=()):
+        super().__init__()
+        self.stream = stream
+        self.extend(lines)
+
+    def append(self, line) -> None:
+        super().append(line)
+        self.stream.log(line)
+
+    def extend(self, lines) -> None:
+        for line in lines:
+            self.append(line)
+
+
+# --- Serve mode (--serve) ---------------------------------------------------
+#
+# One JSON object per line in, one per line out. A line is either a bare
+# AuditorRequest or an envelope {"id": ..., "request": {...}}; the reply is
+# {"id": ..., "result": AuditorResult}. {"op": "shutdown"} stops the server
+# after in-flight requests finish. See docs/PAYLOAD_SCHEMA.md.
+
+class RequestServer:
+    """Runs AuditorRequests concurrently on a shared engine and worker pool."""
+
+    def __init__(self, workers: int):
+        self.engine = RobinEngine()
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="auditor")
+        self.stopping = threading.Event()
+
+    def handle_line(self, line: str, reply) -> None:
+        """Parse one protocol line and schedule it; reply(dict) is called from a worker."""
+        line = line.strip()
+        if not line:
+            return
+        try:
+            msg = json.loads(line)
+            if not isinstance(msg, dict):
+                raise ValueError("expected a JSON object")
+        except Exception as ex:
+            reply({"id": None, "error": f"Bad request line: {ex!r}"})
+            return
+
+        if msg.get("op") == "shutdown":
+            self.stopping.set()
+            reply({"id": msg.get("id"), "ok": True})
+            return
+
+        req_id, req = split_envelope(msg)
+        try:
+            self.pool.submit(self._run_one, req_id, req, reply)
+        except RuntimeError:
+            # Pool already shut down
+            reply({"id": req_id, "error": "Server is shutting down."})
+
+    def _run_one(self, req_id, req: dict, reply) -> None:
+        log_lines: list[str] = [f"runner.py serve request: { _now_utc_iso() }"]
+        try:
+            result = run_request(req, log_lines, self.engine)
+        except Exception as ex:
+            log_lines.append(traceback.format_exc(limit=2))
+            result = {
+                "summary": f"runner.py request failed: {ex!r}",
+                "findings": [],
+                "log_lines": log_lines,
+            }
+        try:
+            reply({"id": req_id, "result": result})
+        except Exception as ex:
+            print(f"Failed to deliver result for request {req_id!r}: {ex!r}", file=sys.stderr)
+
+    def close(self) -> None:
+        """Stop taking work and wait for in-flight requests to finish."""
+        self.stopping.set()
+        self.pool.shutdown(wait=True)
+
+
+def _json_line(obj: dict) -> str:
+    return json.dumps(obj, ensure_ascii=False) + "\n"
+
+
+def serve_stdio(server: RequestServer) -> None:
+    # Keep the real stdout for the protocol; anything the vendor code prints goes to stderr.
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    out_lock = threading.Lock()
+
+    def reply(obj: dict) -> None:
+        with out_lock:
+            out.write(_json_line(obj))
+            out.flush()
+
+    for line in sys.stdin:
+        server.handle_line(line, reply)
+        if server.stopping.is_set():
+            break
+
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server: RequestServer = self.server.auditor  # type: ignore[attr-defined]
+        out_lock = threading.Lock()
+        done = threading.Condition()
+        pending = [0]
+
+        def reply(obj: dict) -> None:
+            with out_lock:
+                try:
+                    self.wfile.write(_json_line(obj).encode("utf-8"))
+                    self.wfile.flush()
+                finally:
+                    with done:
+                        pending[0] -= 1
+                        done.notify_all()
+
+        for raw in self.rfile:
+            line = raw.decode("utf-8", errors="replace")
+            if not line.strip():
+                continue
+            with done:
+                pending[0] += 1  # every non-blank line gets exactly one reply
+            server.handle_line(line, reply)
+            if server.stopping.is_set():
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                break
+
+        # Keep the connection open until every reply for it has been written
+        with done:
+            done.wait_for(lambda: pending[0] <= 0)
+
+
+def serve_tcp(server: RequestServer, host: str, port: int) -> None:
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer((host, port), _LineHandler) as tcp:
+        tcp.daemon_threads = True
+        tcp.auditor = server  # type: ignore[attr-defined]
+        print(f"runner.py serving on {host}:{tcp.server_address[1]}", file=sys.stderr, flush=True)
+        tcp.serve_forever(poll_interval=0.5)
+
+
+def serve(args) -> int:
+    server = RequestServer(args.workers)
+
+    def _on_term(signum, frame):
+        raise KeyboardInterrupt
+
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _on_term)
+
+    try:
+        if args.port is not None:
+            serve_tcp(server, args.host, args.port)
+        else:
+            serve_stdio(server)
+    except KeyboardInterrupt:
+        print("runner.py: shutdown requested; finishing in-flight requests…", file=sys.stderr, flush=True)
+    finally:
+        server.close()
+        _drain_webhooks(args.webhook_wait)
+    return 0
+
+
+def _drain_webhooks(wait: float) -> None:
+    left = get_webhook_queue().close(wait)
+    if left:
+        print(f"runner.py: {left} webhook deliveries left in the spool for the next start.", file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NemesisC64 Auditor runner")
+    parser.add_argument("--input", help="Path to input JSON")
+    parser.add_argument("--output", help="Path to output JSON")
+    parser.add_argument("--serve", action="store_true", help="Stay resident and answer JSON-line requests")
+    parser.add_argument("--port", type=int, default=None, help="With --serve: listen on this local TCP port instead of stdin")
+    parser.add_argument("--host", default="127.0.0.1", help="With --serve --port: bind address (default: 127.0.0.1)")
+    parser.add_argument("--workers", type=int, default=4, help="With --serve or a batch --input: concurrent requests (default: 4)")
+    parser.add_argument("--stream", action="store_true", help="Emit findings, stages and log lines as NDJSON on stdout while running")
+    parser.add_argument("--search", metavar="TEXT", help="Search the findings history instead of running an audit")
+    parser.add_argument("--search-query", metavar="QUERY", help="With --search: only findings reported for this audit query")
+    parser.add_argument("--limit", type=int, default=50, help="With --search: maximum matches (default: 50)")
+    parser.add_argument("--webhook-wait", type=float, default=5.0, help="Seconds to wait for the first attempt of this run's webhook before exit (default: 5)")
+    parser.add_argument("--webhook-batch", type=int, default=1, help="Send up to N queued results per webhook POST (default: 1, no batching)")
+    args = parser.parse_args()
+
+    if args.serve:
+        get_webhook_queue(args.webhook_batch).start()
+        return serve(args)
+    if args.search is not None:
+        return search_history(args)
+    if not args.input or not args.output:
+        parser.error("--input and --output are required unless --serve is given")
+    # Replays anything an earlier run left undelivered
+    get_webhook_queue(args.webhook_batch).start()
+
+    if not args.stream:
+        try:
+            return run_once(args, [], None)
+        finally:
+            _drain_webhooks(args.webhook_wait)
+
+    # Keep the real stdout for records; anything the vendor code prints goes to stderr.
+    stream = ResultStream(sys.stdout)
+    sys.stdout = sys.stderr
+    try:
+        return run_once(args, StreamedLog(stream), stream)
+    except Exception as e:
+        # The stream must still end with "final"; stdout is stderr by now, so the __main__ fallback would not reach the host
+        traceback.print_exc()
+        stream.emit("final", summary=f"runner.py crashed: {e!r}", findings=len(stream.spool),
+                    output=None, exit_code=99)
+        return 99
+    finally:
+        stream.close()
+        _drain_webhooks(args.webhook_wait)
+
+
+def search_history(args) -> int:
+    """--search: print matching findings from every past run as JSON (or write them to --output)."""
+    try:
+        store = get_findings_store()
+        if store is None:
+            print("Findings store is disabled (NCA_FINDINGS_DB=off).", file=sys.stderr)
+            return 1
+        matches = store.search(args.search, query=args.search_query, limit=args.limit)
+        if args.output:
+            write_output_json(args.output, {"matches": matches})
+        else:
+            print(json.dumps(matches, ensure_ascii=False, indent=2))
+    except Exception as ex:
+        print(f"Findings search failed: {ex!r}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _finding_count(payload: dict) -> int:
+    """Findings in a result, counting every request's for batch results."""
+    return len(payload["findings"]) + sum(len(r["result"]["findings"]) for r in payload.get("results", []))
+
+
+def run_once(args, log_lines: list[str], stream: ResultStream | None) -> int:
+    """One-shot mode: --input request file to --output result file."""
+    log_lines.append(f"runner.py start: { _now_utc_iso() }")
+    log_lines.append(f"APP_BASE={APP_BASE}")
+    log_lines.append(f"PROJECT_BASE={PROJECT_BASE}")
+
+    try:
+        req = load_input_json(args.input)
+    except Exception as ex:
+        err = f"Failed to read input JSON: {ex!r}"
+        log_lines.append(err)
+        out = {
+            "summary": "Input error.",
+            "findings": [],
+            "log_lines": log_lines,
+        }
+        write_output_json(args.output, out)
+        if stream:
+            stream.emit("final", summary=out["summary"], findings=0, output=args.output, exit_code=1)
+        return 1
+
+    if isinstance(req, list) or isinstance(req.get("requests"), list):
+        batch = req if isinstance(req, list) else req["requests"]
+        result_payload = run_batch(batch, args.workers, log_lines, stream)
+    else:
+        result_payload = run_request(req, log_lines, stream=stream)
+
     # Write output JSON
     try:
         write_output_json(args.output, result_payload)
     except Exception as ex:
         # As a last resort, write an emergency file in logs
         emergency = os.path.join(LOGS_DIR, f"runner_emergency_{uuid.uuid4().hex}.json")
-        with open(emergency, "w", encoding="utf-8") as f:
-            json.dump(result_payload, f, ensure_ascii=False, indent=2)
+        write_output_json(emergency, result_payload)
         print(f"Failed to write output {args.output}: {ex!r}. Emergency dump: {emergency}", file=sys.stderr)
+        if stream:
+            stream.emit("final", summary=result_payload["summary"], findings=_finding_count(result_payload),
+                        output=emergency, exit_code=2)
         return 2
 
+    if stream:
+        # The records already carried everything; close with the summary instead of the full payload
+        stream.emit("final", summary=result_payload["summary"], findings=_finding_count(result_payload),
+                    output=args.output, exit_code=0)
+        return 0
+
     # Also mirror the final payload back to stdout for quick debugging
     print(json.dumps(result_payload, ensure_ascii=False, indent=2))
     return 0
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+NemesisC64 Auditor - webhook delivery queue (webhook_queue.py)
+
+Results are spooled to /logs/webhook_spool as gzip-compressed JSON before
+anything is sent, then POSTed from a background thread over one keep-alive
+session. Failed deliveries are retried with exponential backoff; whatever is
+still undelivered when the process exits stays in the spool and is replayed by
+the next runner.py start. Permanent failures (4xx other than 408/429, or too
+many attempts) are moved to webhook_spool/dead for inspection.
+
+Several runner processes may share the spool (a --serve daemon next to one-shot
+runs). Before each attempt a process claims the entry by renaming its meta file
+to <id>.meta.json.inflight.<pid>; whoever loses the rename drops the entry, so
+one result is never POSTed by two processes at once. Claims left behind by a
+process that died mid-attempt are released again after STALE_CLAIM_SECONDS.
+
+Webhook secrets are never written to the spool. A meta file holds only a salted
+hash of the URL and secret ("secret_ref"); the secret itself stays in memory. A
+replayed entry whose secret this process does not know is held until a request
+with the same URL and secret is submitted, or NCA_WEBHOOK_SECRET matches it.
+
+With batch_size > 1, results queued for the same URL and secret are sent
+together as {"results": [AuditorResult, ...]} with an X-Auditor-Batch header.
+"""
+
+import glob
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+PROJECT_BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+SPOOL_DIR = os.path.join(os.getenv("NCA_LOGS_DIR") or os.path.join(PROJECT_BASE, "logs"), "webhook_spool")
+
+POST_TIMEOUT = 15    # seconds per delivery attempt
+MAX_ATTEMPTS = 8     # attempts before a result is moved to dead/
+BASE_DELAY = 2       # seconds before the first retry; doubles per attempt
+MAX_DELAY = 300      # cap on the retry delay (seconds)
+STALE_CLAIM_SECONDS = 4 * POST_TIMEOUT  # a claim this old belongs to a process that died mid-attempt
+SECRET_REF_ROUNDS = 100_000             # PBKDF2 rounds behind a spooled secret_ref
+
+
+def secret_ref(url: str, secret: str | None) -> str | None:
+    """Spool-safe reference to a webhook secret: a salted, slow hash tied to the URL."""
+    if not secret:
+        return None
+    digest = hashlib.pbkdf2_hmac("sha256", secret.encode("utf-8"), f"nca-webhook:{url}".encode("utf-8"),
+                                 SECRET_REF_ROUNDS)
+    return digest.hex()[:32]
+
+
+class WebhookQueue:
+    def __init__(self, spool_dir: str = SPOOL_DIR, batch_size: int = 1):
+        self.spool_dir = spool_dir
+        self.batch_size = max(1, batch_size)
+        self._cond = threading.Condition()
+        self._heap: list = []  # (next_attempt, seq, job)
+        self._seq = itertools.count()
+        self._inflight = 0
+        self._unattempted: set[str] = set()  # ids submitted here that have not had a first attempt
+        self._secrets: dict[str, str] = {}   # secret_ref -> secret, for every secret seen by this process
+        self._held: dict[str, list] = {}     # secret_ref -> replayed jobs waiting for their secret
+        self._stopping = False
+        self._thread = None
+        self._session = None
+        self._claim_suffix = f".inflight.{os.getpid()}"
+        os.makedirs(os.path.join(spool_dir, "dead"), exist_ok=True)
+        self.replayed = self._replay()
+
+    # --- spool -------------------------------------------------------------
+
+    def _paths(self, job_id: str):
+        base = os.path.join(self.spool_dir, job_id)
+        return base + ".json.gz", base + ".meta.json"
+
+    def _write_json(self, path: str, job: dict) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(job, f)
+            os.replace(tmp, path)
+        except BaseException:
+            _remove_quietly(tmp)
+            raise
+
+    def _replay(self) -> int:
+        """Queue every result a previous (or another) process left undelivered."""
+        for claim in glob.glob(os.path.join(self.spool_dir, "*.meta.json.inflight.*")):
+            try:
+                if time.time() - os.path.getmtime(claim) > STALE_CLAIM_SECONDS:
+                    os.replace(claim, claim[:claim.index(".inflight.")])
+            except OSError:
+                pass  # released or delivered by someone else meanwhile
+        env_secret = os.getenv("NCA_WEBHOOK_SECRET", "").strip() or None
+        env_refs = {}  # url -> secret_ref of env_secret; the hash is deliberately slow
+        count = 0
+        for meta_path in sorted(glob.glob(os.path.join(self.spool_dir, "*.meta.json"))):
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+            except FileNotFoundError:
+                continue
+            except Exception as ex:
+                print(f"Webhook spool: skipping unreadable {meta_path}: {ex!r}", file=sys.stderr)
+                continue
+            if "secret" in job:
+                # Written before secrets were kept out of the spool; the next meta write drops it
+                secret = job.pop("secret")
+                job["secret_ref"] = secret_ref(job["url"], secret)
+                self._remember(job["secret_ref"], secret)
+            ref = job.get("secret_ref")
+            if ref and ref not in self._secrets and env_secret:
+                if job["url"] not in env_refs:
+                    env_refs[job["url"]] = secret_ref(job["url"], env_secret)
+                if env_refs[job["url"]] == ref:
+                    self._remember(ref, env_secret)
+            if ref and ref not in self._secrets:
+                self._held.setdefault(ref, []).append(job)
+            else:
+                self._push(job)
+            count += 1
+        if self._held:
+            held = sum(len(jobs) for jobs in self._held.values())
+            print(f"Webhook spool: {held} result(s) wait for their webhook secret "
+                  f"(a request with the same URL and secret, or NCA_WEBHOOK_SECRET)", file=sys.stderr)
+        return count
+
+    def _remember(self, ref: str | None, secret: str | None) -> None:
+        if ref:
+            self._secrets[ref] = secret
+
+    def _claim(self, job: dict) -> bool | None:
+        """
+        Takes the entry for one attempt. False when another process has it or it
+        is gone; None when the file is busy (e.g. open elsewhere on Windows) and
+        the attempt should be retried shortly.
+        """
+        body_path, meta_path = self._paths(job["id"])
+        claim = meta_path + self._claim_suffix
+        try:
+            os.replace(meta_path, claim)
+        except FileNotFoundError:
+            return False
+        except OSError as ex:
+            print(f"Webhook spool: cannot claim {job['id']} yet: {ex!r}", file=sys.stderr, flush=True)
+            return None
+        try:
+            os.utime(claim)  # the rename keeps the meta's mtime; staleness counts from the claim
+        except OSError:
+            pass
+        if not os.path.exists(body_path):
+            _remove_quietly(claim)  # body already gone: delivered elsewhere
+            return False
+        job["_claim"] = claim
+        return True
+
+    def _release(self, job: dict) -> None:
+        """Hands the entry back to the spool with its updated attempt count."""
+        claim = job.pop("_claim")
+        self._write_json(self._paths(job["id"])[1], job)
+        _remove_quietly(claim)
+
+    def _remove(self, job: dict) -> None:
+        _remove_quietly(self._paths(job["id"])[0])
+        _remove_quietly(job.pop("_claim"))
+
+    def _bury(self, job: dict) -> None:
+        dead = os.path.join(self.spool_dir, "dead")
+        body_path, meta_path = self._paths(job["id"])
+        claim = job.pop("_claim")
+        try:
+            os.replace(body_path, os.path.join(dead, os.path.basename(body_path)))
+            self._write_json(os.path.join(dead, os.path.basename(meta_path)), job)
+        except FileNotFoundError:
+            pass
+        _remove_quietly(claim)
+
+    # --- queue -------------------------------------------------------------
+
+    def _push(self, job: dict) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (job["next_attempt"], next(self._seq), job))
+            self._cond.notify_all()
+
+    def submit(self, url: str, secret: str | None, chunks) -> str:
+        """
+        Spool one result (chunks: the JSON body as an iterable of str) and queue it.
+        Returns the job id; delivery happens in the background.
+        """
+        job_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
+        body_path, meta_path = self._paths(job_id)
+        with gzip.open(body_path + ".tmp", "wt", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(body_path + ".tmp", body_path)
+        ref = secret_ref(url, secret)
+        job = {"id": job_id, "url": url, "secret_ref": ref, "attempts": 0,
+               "created": time.time(), "next_attempt": time.time()}
+        self._write_json(meta_path, job)
+        with self._cond:
+            self._remember(ref, secret)
+            self._unattempted.add(job_id)
+            waiting = self._held.pop(ref, []) if ref else []
+        for held in waiting:
+            self._push(held)
+        self._push(job)
+        self.start()
+        return job_id
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap) + self._inflight
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is None and self._heap:
+                self._thread = threading.Thread(target=self._run, name="webhook-queue", daemon=True)
+                self._thread.start()
+
+    def close(self, wait: float = 0.0) -> int:
+        """
+        Waits up to `wait` seconds for the first attempt of every result submitted
+        by this process, then stops. Replayed results and scheduled retries are never
+        waited for; they stay in the spool for the next start.
+        Returns how many queued results were not delivered (they stay in the spool).
+        """
+        deadline = time.monotonic() + max(0.0, wait)
+        with self._cond:
+            while self._unattempted and self._thread is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(timeout=left)
+            self._stopping = True
+            self._cond.notify_all()
+        return self.pending()
+
+    def _next_batch(self) -> list[dict] | None:
+        """Wait for a due job; return it with any other due jobs for the same endpoint (not yet claimed)."""
+        with self._cond:
+            while not self._stopping:
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    batch = [heapq.heappop(self._heap)[2]]
+                    endpoint = (batch[0]["url"], batch[0].get("secret_ref"))
+                    keep = []
+                    while self._heap and len(batch) < self.batch_size and self._heap[0][0] <= now:
+                        item = heapq.heappop(self._heap)
+                        if (item[2]["url"], item[2].get("secret_ref")) == endpoint:
+                            batch.append(item[2])
+                        else:
+                            keep.append(item)
+                    for item in keep:
+                        heapq.heappush(self._heap, item)
+                    self._inflight += len(batch)
+                    return batch
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._cond.wait(timeout=timeout)
+            return None
+
+    def _claim_batch(self, batch: list[dict]) -> list[dict]:
+        """Claims each job of batch; busy ones are retried shortly, lost ones dropped."""
+        claimed, busy, lost = [], [], []
+        for job in batch:
+            outcome = self._claim(job)
+            (claimed if outcome else busy if outcome is None else lost).append(job)
+        if busy or lost:
+            with self._cond:
+                self._inflight -= len(busy) + len(lost)
+                for job in lost:
+                    self._unattempted.discard(job["id"])
+                for job in busy:
+                    job["next_attempt"] = time.time() + BASE_DELAY
+                    heapq.heappush(self._heap, (job["next_attempt"], next(self._seq), job))
+                self._cond.notify_all()
+        return claimed
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                batch = self._claim_batch(batch)
+            except Exception as ex:
+                print(f"Webhook queue: unexpected error, retrying: {ex!r}", file=sys.stderr, flush=True)
+                time.sleep(BASE_DELAY)
+                continue
+            if not batch:
+                continue
+            try:
+                status, detail = self._deliver(batch)
+            except Exception as ex:
+                status, detail = None, repr(ex)
+            self._settle(batch, status, detail)
+
+    # --- delivery ----------------------------------------------------------
+
+    def _deliver(self, batch: list[dict]):
+        import requests  # type: ignore  # only needed once something is delivered
+
+        if self._session is None:
+            self._session = requests.Session()
+        bodies = []
+        for job in batch:
+            with gzip.open(self._paths(job["id"])[0], "rb") as f:
+                bodies.append(f.read())
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        ref = batch[0].get("secret_ref")
+        if ref:
+            headers["X-Auditor-Secret"] = self._secrets[ref]
+        if len(batch) > 1:
+            headers["X-Auditor-Batch"] = str(len(batch))
+            raw = b'{"results": [' + b",".join(bodies) + b"]}"
+        else:
+            raw = bodies[0]
+        r = self._session.post(batch[0]["url"], headers=headers, data=gzip.compress(raw), timeout=POST_TIMEOUT)
+        return r.status_code, f"status={r.status_code}"
+
+    def _settle(self, batch: list[dict], status: int | None, detail: str) -> None:
+        url = batch[0]["url"]
+        ids = ", ".join(job["id"] for job in batch)
+        ok = status is not None and 200 <= status < 300
+        permanent = status is not None and 400 <= status < 500 and status not in (408, 429)
+        retry = []
+        for job in batch:
+            job["attempts"] += 1
+            try:
+                if ok:
+                    self._remove(job)
+                elif permanent or job["attempts"] >= MAX_ATTEMPTS:
+                    self._bury(job)
+                else:
+                    delay = min(MAX_DELAY, BASE_DELAY * 2 ** (job["attempts"] - 1)) * random.uniform(0.5, 1.0)
+                    job["next_attempt"] = time.time() + delay
+                    self._release(job)
+                    retry.append(job)
+            except Exception as ex:
+                print(f"Webhook spool: could not update {job['id']}: {ex!r}", file=sys.stderr, flush=True)
+        if ok:
+            print(f"Webhook POST -> {url} [{detail}] delivered {ids}", file=sys.stderr, flush=True)
+        elif retry:
+            print(f"Webhook POST -> {url} failed [{detail}]; retrying {ids}", file=sys.stderr, flush=True)
+        else:
+            print(f"Webhook POST -> {url} failed [{detail}]; gave up on {ids} (see {self.spool_dir}/dead)",
+                  file=sys.stderr, flush=True)
+        with self._cond:
+            self._inflight -= len(batch)
+            for job in batch:
+                self._unattempted.discard(job["id"])
+            for job in retry:
+                heapq.heappush(self._heap, (job["next_attempt"], next(self._seq), job))
+            self._cond.notify_all()
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_webhook_queue(batch_size: int | None = None) -> WebhookQueue:
+    """Returns the process-wide queue; the first call replays the spool."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WebhookQueue(batch_size=batch_size or 1)
+        elif batch_size:
+            _queue.batch_size = max(1, batch_size)
+    return _queue